@@ -12,9 +12,13 @@ IPFS 네트워크에 데이터를 업로드하는 클라이언트 스크립트.
 
 import os
 import sys
+import json
+import atexit
 import logging
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 try:
     import ipfshttpclient
@@ -33,6 +37,15 @@ logger = logging.getLogger(__name__)
 # 설정 상수
 DEFAULT_DATA_DIR = Path('data')
 DEFAULT_IPFS_HOST = '/ip4/127.0.0.1/tcp/5001'
+DEFAULT_MANIFEST_FILE = Path('.ipfs_manifest.json')  # 업로드된 파일 목록 (경로 → mtime, 크기, CID)
+MFS_ROOT = '/esp32-openwrt'  # 증분 업로드 디렉토리를 구성하는 MFS 경로
+# filestore(nocopy) 추가 여부: 데몬에서 Experimental.FilestoreEnabled 필요.
+# 서버가 아직 쓰고 있는 파일을 참조하면 이후 블록 검증이 실패하므로 기본값은 사용 안 함
+IPFS_NOCOPY = os.getenv('IPFS_NOCOPY', '0') == '1'
+# nocopy 여부와 관계없이 같은 CID가 나오도록 공통 add 옵션 사용
+ADD_OPTIONS = {'raw_leaves': True, 'cid_version': 1, 'chunker': 'size-1048576'}
+# 공유 세션을 재사용하기 전 version() 재확인 간격 (초)
+HEALTH_CHECK_INTERVAL = float(os.getenv('IPFS_HEALTH_CHECK_INTERVAL', '60'))
 
 
 def validate_data_directory(data_dir: Path) -> bool:
@@ -56,13 +69,15 @@ def validate_data_directory(data_dir: Path) -> bool:
     return True
 
 
-def upload_to_ipfs(data_dir: Path, ipfs_host: Optional[str] = None) -> Optional[str]:
+def upload_to_ipfs(data_dir: Path, ipfs_host: Optional[str] = None,
+                   client: Optional['IPFSClient'] = None) -> Optional[str]:
     """
     데이터 디렉토리를 IPFS에 업로드합니다.
     
     Args:
         data_dir: 업로드할 데이터 디렉토리 Path
         ipfs_host: IPFS 호스트 주소 (기본값: 로컬 IPFS 노드)
+        client: 사용할 IPFSClient (기본값: 프로세스 공용 세션)
         
     Returns:
         IPFS 해시 문자열 또는 None (실패 시)
@@ -70,41 +85,37 @@ def upload_to_ipfs(data_dir: Path, ipfs_host: Optional[str] = None) -> Optional[
     if not validate_data_directory(data_dir):
         return None
     
-    ipfs_host = ipfs_host or os.getenv('IPFS_HOST', DEFAULT_IPFS_HOST)
-    
     try:
-        logger.info(f"IPFS 연결 시도: {ipfs_host}")
+        # 업로드마다 새 HTTP 세션을 열지 않고 공용 세션을 재사용
+        if client is None:
+            client = get_shared_client(ipfs_host)
+        
         logger.info(f"업로드 디렉토리: {data_dir.absolute()}")
         
-        # IPFS 클라이언트 연결 (컨텍스트 매니저 사용)
-        with ipfshttpclient.connect(ipfs_host) as client:
-            # IPFS 노드 연결 확인
-            try:
-                client.version()
-                logger.info("IPFS 노드 연결 성공")
-            except Exception as e:
-                logger.error(f"IPFS 노드 연결 실패: {e}")
-                logger.error("IPFS daemon이 실행 중인지 확인하세요: ipfs daemon")
+        # 같은 클라이언트를 쓰는 다른 스레드가 세션을 교체하지 않도록 업로드 전체를 잠금
+        with client.lock:
+            # IPFS 노드 연결 확인 (공유 세션 상태를 주기적으로만 확인)
+            if not client.check_connection():
                 return None
             
             # 데이터 디렉토리 업로드
             logger.info("데이터 업로드 중...")
-            result = client.add(str(data_dir), recursive=True)
+            ipfs_hash = client.upload(data_dir)
             
-            if not result:
+            if not ipfs_hash:
                 logger.error("업로드 결과가 비어있습니다")
                 return None
             
-            # 마지막 항목의 해시 가져오기 (디렉토리 업로드 시)
-            ipfs_hash = result[-1]['Hash']
             logger.info(f"IPFS 해시: {ipfs_hash}")
             
-            # 업로드된 데이터 통계 확인
-            try:
-                stat = client.stat(ipfs_hash)
-                logger.info(f"업로드된 데이터 크기: {stat.get('CumulativeSize', 'N/A')} bytes")
-            except Exception as e:
-                logger.warning(f"통계 조회 실패: {e}")
+            # 이번에 전송한 데이터 크기 (추가 요청 없이 변경 파일의 로컬 크기 합계 사용)
+            logger.info(f"업로드된 데이터 크기: {client.last_upload_size} bytes")
+            
+            # object stat은 DAG 전체를 순회하므로 디버그 로깅 시에만 조회
+            if logger.isEnabledFor(logging.DEBUG):
+                stat = client.get_stat(ipfs_hash)
+                if stat:
+                    logger.debug(f"IPFS 누적 크기: {stat.get('CumulativeSize', 'N/A')} bytes")
             
             return ipfs_hash
             
@@ -121,33 +132,139 @@ class IPFSClient:
     """
     IPFS 클라이언트 클래스
     세션을 유지하면서 여러 작업을 수행할 때 사용
+    
+    HTTP 세션은 호스트별로 클래스에 한 번만 만들어 모든 인스턴스가 공유하며,
+    업로드 오류가 나면 버리고 다시 연결합니다.
     """
     
-    def __init__(self, ipfs_host: Optional[str] = None):
+    _shared_clients: Dict[str, 'ipfshttpclient.Client'] = {}
+    _probed_at: Dict[str, float] = {}
+    _shared_lock = threading.RLock()
+    
+    def __init__(self, ipfs_host: Optional[str] = None, manifest_file: Optional[Path] = None):
         """
         IPFS 클라이언트 초기화
         
         Args:
             ipfs_host: IPFS 호스트 주소
+            manifest_file: 증분 업로드 manifest 파일 경로
         """
         self.ipfs_host = ipfs_host or os.getenv('IPFS_HOST', DEFAULT_IPFS_HOST)
+        self.manifest_file = manifest_file or Path(os.getenv('IPFS_MANIFEST', DEFAULT_MANIFEST_FILE))
         self._client: Optional[ipfshttpclient.Client] = None
+        self._nocopy = IPFS_NOCOPY
+        self.last_upload_size: Optional[int] = None
+        # 여러 스레드가 같은 객체로 업로드할 때 세션 교체와 manifest 갱신을 직렬화
+        self.lock = threading.RLock()
     
     def __enter__(self):
         """컨텍스트 매니저 진입"""
-        self._client = ipfshttpclient.connect(self.ipfs_host, session=True)
-        logger.info(f"IPFS 세션 시작: {self.ipfs_host}")
-        return self
+        return self.open()
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """컨텍스트 매니저 종료"""
-        if self._client:
-            self._client.close()
-            logger.info("IPFS 세션 종료")
+        self.close()
+    
+    def open(self) -> 'IPFSClient':
+        """
+        IPFS 세션 연결
+        호스트별 공유 세션이 정상이면 다시 연결하지 않고 재사용
+        """
+        with self.lock:
+            # 공유 세션은 connect() 또는 주기적 version() 확인을 통과한 상태
+            self._client = self._acquire_shared(self.ipfs_host)
+        return self
+    
+    def close(self) -> None:
+        """공유 세션은 유지하고 이 객체의 참조만 해제"""
+        with self.lock:
+            self._client = None
+    
+    @classmethod
+    def _acquire_shared(cls, ipfs_host: str) -> 'ipfshttpclient.Client':
+        """
+        호스트별 공유 세션을 반환 (없거나 응답이 없으면 새로 연결)
+        
+        Args:
+            ipfs_host: IPFS 호스트 주소
+            
+        Returns:
+            세션이 열린 ipfshttpclient.Client 객체
+        """
+        with cls._shared_lock:
+            client = cls._shared_clients.get(ipfs_host)
+            now = time.monotonic()
+            
+            # 마지막 확인 후 HEALTH_CHECK_INTERVAL이 지났을 때만 version() 요청
+            if client is not None and now - cls._probed_at[ipfs_host] >= HEALTH_CHECK_INTERVAL:
+                try:
+                    client.version()
+                    cls._probed_at[ipfs_host] = now
+                except Exception as e:
+                    logger.warning(f"IPFS 세션 응답 없음, 다시 연결합니다: {e}")
+                    cls._discard_shared(ipfs_host)
+                    client = None
+            
+            if client is None:
+                logger.info(f"IPFS 연결 시도: {ipfs_host}")
+                client = ipfshttpclient.connect(ipfs_host, session=True)
+                cls._shared_clients[ipfs_host] = client
+                cls._probed_at[ipfs_host] = time.monotonic()
+                logger.info(f"IPFS 세션 시작: {ipfs_host}")
+            
+            return client
+    
+    @classmethod
+    def _discard_shared(cls, ipfs_host: str) -> None:
+        """공유 세션을 닫고 제거 (잠금을 잡은 상태에서 호출)"""
+        client = cls._shared_clients.pop(ipfs_host, None)
+        cls._probed_at.pop(ipfs_host, None)
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+            logger.info(f"IPFS 세션 종료: {ipfs_host}")
+    
+    @classmethod
+    def close_all(cls) -> None:
+        """모든 공유 세션 종료 (프로세스 종료 시 호출)"""
+        with cls._shared_lock:
+            for ipfs_host in list(cls._shared_clients):
+                cls._discard_shared(ipfs_host)
+    
+    def _reconnect(self) -> None:
+        """공유 세션을 버리고 새로 연결 (실패하면 다음 open()에서 재시도, self.lock 보유 상태에서 호출)"""
+        with self._shared_lock:
+            if self._shared_clients.get(self.ipfs_host) is self._client:
+                self._discard_shared(self.ipfs_host)
+        self._client = None
+        try:
+            self.open()
+        except Exception as e:
+            logger.error(f"IPFS 재연결 실패: {e}")
+    
+    def check_connection(self) -> bool:
+        """
+        IPFS 노드 연결 확인
+        공유 세션을 다시 가져오며, 마지막 확인 후 HEALTH_CHECK_INTERVAL이 지났을 때만
+        version()을 요청하고 응답이 없으면 새로 연결
+        
+        Returns:
+            연결되어 있으면 True
+        """
+        try:
+            self.open()
+            return True
+        except Exception as e:
+            logger.error(f"IPFS 노드 연결 실패: {e}")
+            logger.error("IPFS daemon이 실행 중인지 확인하세요: ipfs daemon")
+            return False
     
     def upload(self, data_path: Path) -> Optional[str]:
         """
         데이터를 IPFS에 업로드
+        디렉토리는 이전 업로드 이후 변경된 파일만 전송
         
         Args:
             data_path: 업로드할 파일/디렉토리 Path
@@ -155,19 +272,181 @@ class IPFSClient:
         Returns:
             IPFS 해시 또는 None
         """
-        if not self._client:
-            raise RuntimeError("IPFS 클라이언트가 초기화되지 않았습니다")
-        
-        try:
-            result = self._client.add(str(data_path), recursive=True)
-            if result:
-                ipfs_hash = result[-1]['Hash']
+        with self.lock:
+            if not self._client:
+                raise RuntimeError("IPFS 클라이언트가 초기화되지 않았습니다")
+            
+            try:
+                if data_path.is_dir():
+                    ipfs_hash = self._upload_directory(data_path)
+                else:
+                    ipfs_hash = self._add(str(data_path))['Hash']
+                    self.last_upload_size = data_path.stat().st_size
                 logger.info(f"업로드 완료: {ipfs_hash}")
                 return ipfs_hash
-        except Exception as e:
-            logger.error(f"업로드 실패: {e}")
+            except Exception as e:
+                logger.error(f"업로드 실패: {e}")
+                # 세션 상태를 알 수 없으므로 다음 업로드 전에 새로 연결
+                self._reconnect()
+                return None
+    
+    def _upload_directory(self, data_dir: Path) -> str:
+        """
+        변경된 파일만 한 번의 add 요청으로 전송하고 MFS에서 디렉토리를 구성
+        
+        manifest에 기록된 (mtime, 크기)가 같은 파일은 다시 해싱하지 않고,
+        새 파일의 CID만 MFS 디렉토리에 연결해 루트 CID를 얻습니다.
+        
+        Args:
+            data_dir: 업로드할 디렉토리 Path
+            
+        Returns:
+            디렉토리 루트 CID
+        """
+        data_dir = data_dir.resolve()
+        key = str(data_dir)
+        mfs_dir = MFS_ROOT + data_dir.as_posix()
+        
+        # 데몬마다 MFS 상태가 다르므로 호스트별로 기록
+        manifest = self._load_manifest()
+        host_manifest = manifest.setdefault(self.ipfs_host, {})
+        entry = host_manifest.get(key)
+        if entry is not None and self._mfs_root(mfs_dir) != entry['root']:
+            # 데몬의 MFS가 초기화되었거나 바뀌었으면 증분 업로드 시 이전 파일이 빠지므로 전체 재구성
+            logger.warning(f"MFS 디렉토리가 manifest와 다름, 전체 재업로드: {mfs_dir}")
+            entry = None
+        if entry is None:
+            # manifest가 없으면 이전 MFS 내용을 비우고 새로 구성
+            self._mfs_remove(mfs_dir, recursive=True)
+            entry = {'root': None, 'files': {}}
+        known: Dict[str, List] = entry['files']
+        
+        current = {}
+        for path in sorted(data_dir.rglob('*')):
+            if path.is_file():
+                st = path.stat()
+                current[path.relative_to(data_dir).as_posix()] = (path, st.st_mtime_ns, st.st_size)
+        
+        changed = [rel for rel, (_, mtime, size) in current.items()
+                   if known.get(rel, [None, None])[:2] != [mtime, size]]
+        removed = [rel for rel in known if rel not in current]
+        
+        # 이번 add 요청으로 실제 전송하는 변경 파일 크기 합계
+        self.last_upload_size = sum(current[rel][2] for rel in changed)
+        
+        if not changed and not removed and entry['root']:
+            logger.info("변경된 파일 없음")
+            return entry['root']
+        
+        logger.info(f"변경된 파일 {len(changed)}개, 삭제된 파일 {len(removed)}개")
+        self._client.files.mkdir(mfs_dir, parents=True)
+        
+        if changed:
+            # 변경된 파일을 하나의 multipart 요청으로 전송 (응답은 요청 순서와 동일)
+            result = self._add(*[str(current[rel][0]) for rel in changed])
+            if not isinstance(result, list):
+                result = [result]
+            if len(result) != len(changed):
+                raise RuntimeError(f"add 응답 개수 불일치: {len(result)} != {len(changed)}")
+            
+            for rel, item in zip(changed, result):
+                dest = f"{mfs_dir}/{rel}"
+                # 이전 업로드가 manifest 저장 전에 실패했으면 manifest에 없는 항목이
+                # MFS에 남아 있을 수 있으므로 항상 먼저 삭제
+                self._mfs_remove(dest)
+                if '/' in rel:
+                    self._client.files.mkdir(dest.rsplit('/', 1)[0], parents=True)
+                self._client.files.cp(f"/ipfs/{item['Hash']}", dest)
+                _, mtime, size = current[rel]
+                known[rel] = [mtime, size, item['Hash']]
+        
+        for rel in removed:
+            self._mfs_remove(f"{mfs_dir}/{rel}")
+            del known[rel]
+        
+        entry['root'] = self._client.files.stat(mfs_dir)['Hash']
+        host_manifest[key] = entry
+        self._save_manifest(manifest)
+        return entry['root']
+    
+    def _add(self, *paths: str):
+        """
+        파일을 IPFS에 추가
+        filestore(nocopy)로 원본 파일을 참조해 blockstore 복사를 생략하고,
+        데몬이 거부하면 이 세션에서는 일반 복사 방식으로 전환
+        
+        Args:
+            paths: 추가할 파일 경로
+            
+        Returns:
+            add 응답 (파일 하나면 단일 항목, 여러 개면 리스트)
+        """
+        if self._nocopy:
+            try:
+                return self._client.add(*paths, nocopy=True, **ADD_OPTIONS)
+            except ipfshttpclient.exceptions.ErrorResponse as e:
+                logger.warning(f"nocopy 추가 실패, 복사 방식으로 재시도: {e}")
+                logger.warning("filestore 활성화: ipfs config --json Experimental.FilestoreEnabled true")
+                self._nocopy = False
+        
+        return self._client.add(*paths, **ADD_OPTIONS)
+    
+    def _mfs_root(self, mfs_dir: str) -> Optional[str]:
+        """
+        MFS 디렉토리의 현재 CID 조회
+        
+        Args:
+            mfs_dir: MFS 경로
+            
+        Returns:
+            디렉토리 CID 또는 None (존재하지 않는 경우)
+        """
+        try:
+            return self._client.files.stat(mfs_dir)['Hash']
+        except ipfshttpclient.exceptions.ErrorResponse:
             return None
     
+    def _mfs_remove(self, path: str, recursive: bool = False) -> None:
+        """
+        MFS 경로 삭제 (존재하지 않으면 무시)
+        
+        Args:
+            path: MFS 경로
+            recursive: 디렉토리 재귀 삭제 여부
+        """
+        try:
+            self._client.files.rm(path, recursive=recursive)
+        except ipfshttpclient.exceptions.ErrorResponse:
+            pass
+    
+    def _load_manifest(self) -> dict:
+        """
+        manifest 파일 읽기
+        
+        Returns:
+            IPFS 호스트별, 디렉토리 경로별 업로드 기록 (없거나 손상되면 빈 딕셔너리)
+        """
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"manifest 읽기 실패, 전체 업로드 진행: {e}")
+            return {}
+    
+    def _save_manifest(self, manifest: dict) -> None:
+        """
+        manifest 파일 저장 (임시 파일에 쓴 뒤 교체)
+        
+        Args:
+            manifest: 저장할 업로드 기록
+        """
+        tmp_file = self.manifest_file.with_name(self.manifest_file.name + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_file, self.manifest_file)
+    
     def get_stat(self, ipfs_hash: str) -> Optional[dict]:
         """
         IPFS 해시의 통계 정보 조회
@@ -182,17 +461,52 @@ class IPFSClient:
             raise RuntimeError("IPFS 클라이언트가 초기화되지 않았습니다")
         
         try:
-            return self._client.stat(ipfs_hash)
+            return self._client.object.stat(ipfs_hash)
         except Exception as e:
             logger.error(f"통계 조회 실패: {e}")
             return None
 
 
+# 프로세스 종료 시 공유 세션 정리
+atexit.register(IPFSClient.close_all)
+
+# 호스트별 기본 IPFSClient (nocopy 지원 여부 등 인스턴스 상태 유지)
+_default_clients: Dict[str, IPFSClient] = {}
+_default_clients_lock = threading.Lock()
+
+
+def get_shared_client(ipfs_host: Optional[str] = None) -> IPFSClient:
+    """
+    프로세스 전체에서 재사용하는 IPFS 클라이언트를 반환합니다.
+    호출할 때마다 공유 세션 상태를 확인하며, 정상이면 다시 연결하지 않습니다.
+    
+    Args:
+        ipfs_host: IPFS 호스트 주소
+        
+    Returns:
+        세션이 열린 IPFSClient 객체
+    """
+    ipfs_host = ipfs_host or os.getenv('IPFS_HOST', DEFAULT_IPFS_HOST)
+    
+    with _default_clients_lock:
+        client = _default_clients.get(ipfs_host)
+        if client is None:
+            client = IPFSClient(ipfs_host)
+            _default_clients[ipfs_host] = client
+        return client.open()
+
+
 def main() -> None:
     """메인 함수"""
     # 환경 변수에서 데이터 디렉토리 읽기
     data_dir = Path(os.getenv('DATA_DIR', DEFAULT_DATA_DIR))
     
+    # 프로세스 시작 시 미리 연결해 첫 업로드에서 연결 비용을 치르지 않도록 함
+    try:
+        get_shared_client()
+    except Exception as e:
+        logger.warning(f"IPFS 사전 연결 실패 (업로드 시 재시도): {e}")
+    
     # IPFS 업로드
     ipfs_hash = upload_to_ipfs(data_dir)
     
@@ -12,12 +12,24 @@ Socket server for receiving data from ESP32 devices and saving to files.
 """
 
 import socket
+import selectors
 import os
+import errno
 import sys
 import logging
-from datetime import datetime
+import logging.handlers
+import queue
+import mmap
+import fcntl
+import resource
+import time
+import threading
+import itertools
+import struct
+import signal
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 # 로깅 설정
 logging.basicConfig(
@@ -29,9 +41,68 @@ logger = logging.getLogger(__name__)
 # 설정 상수
 DEFAULT_HOST = '0.0.0.0'  # 모든 인터페이스에서 수신
 DEFAULT_PORT = 8070
-BUFFER_SIZE = 1024
+DEFAULT_WORKERS = 1
+DEFAULT_PROCESSES = 1  # 0이면 CPU 코어 수만큼
+LISTEN_BACKLOG = int(os.getenv('SOCKET_SERVER_BACKLOG', 4096))  # net.core.somaxconn으로 제한됨
+# 첫 데이터가 올 때까지 accept를 미루는 시간 (초, 0이면 사용 안 함).
+# 서버가 먼저 환영 메시지를 보내므로 이를 기다리는 클라이언트는 이 시간만큼 지연됨
+DEFER_ACCEPT_SECS = int(os.getenv('SOCKET_SERVER_DEFER_ACCEPT', 0))
+BUFFER_SIZE = int(os.getenv('SOCKET_SERVER_BUFFER_SIZE', 65536))
+SOCKET_RCVBUF_SIZE = int(os.getenv('SOCKET_SERVER_RCVBUF', 8 * 1024 * 1024))
+BUSY_POLL_USEC = int(os.getenv('SOCKET_SERVER_BUSY_POLL_US', 0))  # NAPI busy poll 시간 (0이면 사용 안 함)
+FILE_BUFFER_SIZE = 1 << 20  # 데이터 파일 쓰기 버퍼 (1 MiB)
+FSYNC_INTERVAL = float(os.getenv('SOCKET_SERVER_FSYNC_INTERVAL', 5))  # 초, 0 이하면 종료 시에만 저장
+WRITE_MODE = os.getenv('SOCKET_SERVER_WRITE_MODE', 'buffered')  # buffered | mmap | splice
+MMAP_WINDOW_SIZE = 1 << 20  # mmap 쓰기 창 크기 (1 MiB), 가상 메모리 사용량 제한
+FRAMING = os.getenv('SOCKET_SERVER_FRAMING', 'none')  # none | length (4바이트 빅엔디안 길이 프리픽스)
+# writev 한 번에 모을 프레임 수 (프레임당 iovec 2개, IOV_MAX 1024 이내)
+FRAME_BATCH = min(int(os.getenv('SOCKET_SERVER_FRAME_BATCH', 64)), 512)
+FRAME_HEADER = struct.Struct('!I')
+# 연결당 수신량이 이 값을 넘으면 splice 경로로 전환 (0이면 사용 안 함)
+LARGE_PAYLOAD_THRESHOLD = int(os.getenv('SOCKET_SERVER_LARGE_PAYLOAD', 0))
 DATA_DIR = Path('data')
 WELCOME_MESSAGE = "Welcome to ESP32-OpenWrt Server!"
+STOP_POLL_INTERVAL = 1.0  # 워커 스레드 종료 요청 확인 주기 (초)
+MAX_CONNS = int(os.getenv('SOCKET_SERVER_MAX_CONNS', 0))  # 워커당 최대 동시 연결 수 (0이면 RLIMIT_NOFILE에서 계산)
+FD_RESERVE = 64  # 리스너, 로그, 파이프 등 연결 외 용도로 남겨 둘 디스크립터 수
+ACCEPT_RETRY_DELAY = 1.0  # 디스크립터 부족으로 accept를 멈춘 뒤 다시 시도하기까지 (초)
+RECV_BUF_POOL_SIZE = int(os.getenv('SOCKET_SERVER_RECV_BUF_POOL_SIZE', 256))  # 프레임 모드 공유 수신 버퍼 최대 개수
+
+# Linux 전용 소켓 옵션 (socket 모듈에 상수가 없는 경우 커널 값 사용)
+SO_RCVBUFFORCE = getattr(socket, 'SO_RCVBUFFORCE', 33)
+SO_BUSY_POLL = getattr(socket, 'SO_BUSY_POLL', 46)
+SO_PREFER_BUSY_POLL = getattr(socket, 'SO_PREFER_BUSY_POLL', 69)
+
+# fsync는 수신 루프를 막지 않도록 백그라운드 스레드에서 실행
+_fsync_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fsync')
+
+# 데이터 파일 이름 순번 (워커 스레드 간 공유)
+_file_sequence = itertools.count()
+
+
+def _default_max_conns() -> int:
+    """
+    프로세스의 파일 디스크립터 한도(RLIMIT_NOFILE)로 워커당 최대 연결 수를 계산합니다.
+
+    연결마다 소켓과 데이터 파일(splice 경로는 파이프 2개 추가), fsync 중 복제한
+    디스크립터 하나를 사용하며, 같은 프로세스의 워커가 한도를 나눠 씁니다.
+
+    Returns:
+        워커당 최대 연결 수 (1024 이하)
+    """
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return 1024
+
+    fds_per_conn = 3
+    if WRITE_MODE == 'splice' or LARGE_PAYLOAD_THRESHOLD > 0:
+        fds_per_conn += 2
+    workers = max(1, int(os.getenv('SOCKET_SERVER_WORKERS', DEFAULT_WORKERS)))
+    return max(1, min(1024, (soft - FD_RESERVE) // (fds_per_conn * workers)))
+
+
+if MAX_CONNS <= 0:
+    MAX_CONNS = _default_max_conns()
 
 
 def ensure_data_directory() -> Path:
@@ -52,120 +123,1182 @@ def ensure_data_directory() -> Path:
         sys.exit(1)
 
 
-def create_data_file(data_dir: Path) -> Path:
+def create_data_file(resolved_data_dir: Path) -> Path:
     """
     타임스탬프 기반 데이터 파일 경로를 생성합니다.
     
+    연결마다 resolve()로 stat을 반복하지 않도록 미리 해석한 디렉토리를 받습니다.
+    
     Args:
-        data_dir: 데이터 디렉토리 Path
+        resolved_data_dir: resolve()된 데이터 디렉토리 Path
         
     Returns:
         데이터 파일 Path 객체
     """
-    timestamp = datetime.utcnow().strftime("%Y-%m-%dT-%H:%M:%S")
-    filename = f"{timestamp}.txt"
-    file_path = data_dir / filename
+    # 나노초 타임스탬프 + PID + 순번: 같은 시각에 연결한 기기끼리 파일이 겹치지 않음
+    filename = f"{time.time_ns()}-{os.getpid()}-{next(_file_sequence)}.txt"
+    file_path = resolved_data_dir / filename
     
-    # Path Traversal 방지: 절대 경로가 데이터 디렉토리 내에 있는지 확인
-    try:
-        file_path.resolve().relative_to(data_dir.resolve())
-    except ValueError:
+    # Path Traversal 방지: 파일 경로가 데이터 디렉토리 내에 있는지 확인 (문자열 비교만 수행)
+    if not str(file_path).startswith(str(resolved_data_dir) + os.sep):
         logger.error(f"잘못된 파일 경로: {file_path}")
         raise ValueError("Invalid file path")
     
     return file_path
 
 
-def handle_client(client_socket: socket.socket, client_addr: tuple, data_dir: Path) -> None:
+def set_receive_buffer(sock: socket.socket, size: int, force: bool = False) -> None:
     """
-    클라이언트 연결을 처리합니다.
-    
+    소켓 수신 버퍼 크기를 설정합니다.
+
+    force가 True이면 net.core.rmem_max 제한을 무시하는 SO_RCVBUFFORCE를
+    먼저 시도하고, 권한(CAP_NET_ADMIN)이 없으면 SO_RCVBUF로 대체합니다.
+
+    Args:
+        sock: 대상 소켓
+        size: 수신 버퍼 크기 (bytes, 0이면 커널 자동 조정 유지)
+        force: SO_RCVBUFFORCE 사용 여부
+    """
+    if size <= 0:
+        return
+
+    if force and sys.platform.startswith('linux'):
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, SO_RCVBUFFORCE, size)
+            return
+        except OSError:
+            pass
+
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+    except OSError as e:
+        logger.warning(f"수신 버퍼 설정 실패: {e}")
+
+
+def configure_client_socket(client_socket: socket.socket) -> None:
+    """
+    수락된 클라이언트 소켓에 지연 최소화 옵션을 설정합니다.
+
+    - TCP_NODELAY: 작은 ESP32 메시지의 Nagle 지연 제거
+    - TCP_QUICKACK: 지연 ACK 비활성화 (Linux)
+    - SO_RCVBUFFORCE: 권한이 있으면 rmem_max 이상으로 수신 버퍼 확장
+    - SO_BUSY_POLL: BUSY_POLL_USEC가 설정되면 softirq를 기다리지 않고
+      수신 큐를 직접 폴링 (Linux, net.core.busy_poll과 함께 사용)
+
+    Args:
+        client_socket: 클라이언트 소켓 객체
+    """
+    try:
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if hasattr(socket, 'TCP_QUICKACK'):
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+    except OSError as e:
+        logger.warning(f"클라이언트 소켓 옵션 설정 실패: {e}")
+
+    set_receive_buffer(client_socket, SOCKET_RCVBUF_SIZE, force=True)
+
+    if BUSY_POLL_USEC > 0 and sys.platform.startswith('linux'):
+        _set_busy_poll_option(client_socket, 'SO_BUSY_POLL', SO_BUSY_POLL, BUSY_POLL_USEC)
+        # SO_PREFER_BUSY_POLL은 CAP_NET_ADMIN이 필요하므로 실패해도 SO_BUSY_POLL은 유지
+        _set_busy_poll_option(client_socket, 'SO_PREFER_BUSY_POLL', SO_PREFER_BUSY_POLL, 1)
+
+
+# 연결마다 같은 경고를 반복하지 않도록 프로세스당 한 번만 기록한 옵션 이름
+_busy_poll_warned: set = set()
+
+
+def _set_busy_poll_option(client_socket: socket.socket, name: str, option: int, value: int) -> None:
+    """
+    busy poll 소켓 옵션을 설정합니다 (실패 경고는 옵션별로 한 번만 기록).
+
     Args:
         client_socket: 클라이언트 소켓 객체
-        client_addr: 클라이언트 주소 튜플
-        data_dir: 데이터 디렉토리 Path
+        name: 로그용 옵션 이름
+        option: SOL_SOCKET 옵션 값
+        value: 설정할 값
+    """
+    try:
+        client_socket.setsockopt(socket.SOL_SOCKET, option, value)
+    except OSError as e:
+        if name not in _busy_poll_warned:
+            _busy_poll_warned.add(name)
+            logger.warning(f"{name} 설정 실패 (이후 경고 생략): {e}")
+
+
+def _fsync_and_close(fd: int) -> None:
+    """
+    복제된 파일 디스크립터를 fsync한 뒤 닫습니다.
+
+    Args:
+        fd: os.dup()으로 복제한 파일 디스크립터
+    """
+    try:
+        os.fsync(fd)
+    except OSError as e:
+        logger.error(f"fsync 실패: {e}")
+    finally:
+        os.close(fd)
+
+
+def _schedule_fsync(fd: int, pending: Optional[Future], force: bool = False) -> Optional[Future]:
+    """
+    fsync를 백그라운드 스레드에 예약합니다.
+
+    같은 파일의 이전 fsync가 아직 끝나지 않았으면 예약하지 않으므로, 저장 장치가
+    느려도 대기열과 복제된 디스크립터가 파일당 하나를 넘지 않습니다.
+
+    Args:
+        fd: 파일 디스크립터 (복제해서 넘김)
+        pending: 이 파일에 마지막으로 예약한 fsync
+        force: 이전 fsync와 관계없이 예약 (파일을 닫을 때)
+
+    Returns:
+        새로 예약한 Future, 건너뛰었으면 None
+    """
+    if not force and pending is not None and not pending.done():
+        return None
+    # 연결이 먼저 닫혀도 안전하도록 복제한 디스크립터를 넘김
+    return _fsync_executor.submit(_fsync_and_close, os.dup(fd))
+
+
+# posix_fallocate 미지원으로 보고 ftruncate로 대체하는 오류 코드
+_FALLOCATE_UNSUPPORTED = (errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL)
+
+
+def _preallocate(fd: int, offset: int, length: int) -> None:
+    """
+    파일 영역을 미리 할당합니다.
+
+    posix_fallocate를 지원하지 않는 파일 시스템(예: 일부 OpenWrt overlay)에서는
+    ftruncate로 파일 크기만 늘립니다. 디스크 공간 부족(ENOSPC) 등 다른 오류는
+    그대로 전달합니다 (희소 파일에 매핑해 쓰면 SIGBUS로 프로세스가 종료됨).
+
+    Args:
+        fd: 파일 디스크립터
+        offset: 할당 시작 위치
+        length: 할당 크기 (bytes)
+
+    Raises:
+        OSError: 미지원 이외의 할당 실패
+    """
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fd, offset, length)
+            return
+        except OSError as e:
+            if e.errno not in _FALLOCATE_UNSUPPORTED:
+                raise
+
+    if os.fstat(fd).st_size < offset + length:
+        os.ftruncate(fd, offset + length)
+
+
+class DataFileWriter:
+    """
+    버퍼링된 데이터 파일 쓰기
+    패킷마다 flush하지 않고 sync() 호출 시에만 디스크에 저장
+    """
+
+    def __init__(self, data_file: Path):
+        """
+        데이터 파일 열기
+
+        Args:
+            data_file: 데이터 파일 Path
+        """
+        self._file = open(data_file, 'ab', buffering=FILE_BUFFER_SIZE)
+        self._dirty = False
+        self._fsync_future: Optional[Future] = None
+
+    def write(self, data) -> None:
+        """
+        데이터 쓰기
+
+        Args:
+            data: bytes-like 객체
+        """
+        self._file.write(data)
+        self._dirty = True
+
+    def sync(self, force: bool = False) -> None:
+        """
+        버퍼를 비우고 fsync를 백그라운드 스레드에 예약
+        이전 fsync가 진행 중이면 다음 주기로 미룸
+
+        Args:
+            force: 이전 fsync와 관계없이 예약
+        """
+        if not self._dirty:
+            return
+
+        self._file.flush()
+        future = _schedule_fsync(self._file.fileno(), self._fsync_future, force)
+        if future is not None:
+            self._fsync_future = future
+            self._dirty = False
+
+    def close(self) -> None:
+        """파일 닫기"""
+        try:
+            self.sync(force=True)
+        finally:
+            self._file.close()
+
+
+class MmapDataFileWriter:
+    """
+    mmap 기반 데이터 파일 쓰기
+    수신 버퍼를 매핑된 페이지 캐시에 직접 복사해 write() 복사 경로를 생략.
+    대용량 세션을 위해 MMAP_WINDOW_SIZE 단위로 창을 옮겨가며 매핑
+    """
+
+    def __init__(self, data_file: Path):
+        """
+        데이터 파일 열기 및 첫 창 매핑
+
+        Args:
+            data_file: 데이터 파일 Path
+        """
+        # 다른 연결이 같은 파일을 잘라내면 매핑 접근 시 SIGBUS가 발생하므로 단독 생성만 허용
+        self._fd = os.open(data_file, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+        self._mm: Optional[mmap.mmap] = None
+        self._window_start = 0
+        self._offset = 0
+        self._dirty = False
+        self._fsync_future: Optional[Future] = None
+        try:
+            self._map_window()
+        except Exception:
+            os.close(self._fd)
+            raise
+
+    def _map_window(self) -> None:
+        """현재 쓰기 위치를 포함하는 창을 미리 할당하고 매핑"""
+        if self._mm is not None:
+            # 해제된 페이지는 커널이 백그라운드에서 기록
+            self._mm.close()
+
+        self._window_start = self._offset - self._offset % mmap.ALLOCATIONGRANULARITY
+        _preallocate(self._fd, self._window_start, MMAP_WINDOW_SIZE)
+        self._mm = mmap.mmap(self._fd, MMAP_WINDOW_SIZE, offset=self._window_start)
+
+    def write(self, data) -> None:
+        """
+        데이터를 매핑된 창에 복사
+
+        Args:
+            data: bytes-like 객체
+        """
+        view = memoryview(data)
+        while view:
+            pos = self._offset - self._window_start
+            if pos >= MMAP_WINDOW_SIZE:
+                self._map_window()
+                pos = self._offset - self._window_start
+
+            n = min(len(view), MMAP_WINDOW_SIZE - pos)
+            self._mm[pos:pos + n] = view[:n]
+            self._offset += n
+            view = view[n:]
+
+        self._dirty = True
+
+    def sync(self, force: bool = False) -> None:
+        """
+        매핑된 페이지의 fsync를 백그라운드 스레드에 예약
+        이전 fsync가 진행 중이면 다음 주기로 미룸
+
+        Args:
+            force: 이전 fsync와 관계없이 예약
+        """
+        if not self._dirty:
+            return
+
+        future = _schedule_fsync(self._fd, self._fsync_future, force)
+        if future is not None:
+            self._fsync_future = future
+            self._dirty = False
+
+    def close(self) -> None:
+        """매핑 해제 후 미리 할당한 영역을 실제 크기로 잘라내고 닫기"""
+        try:
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+            os.ftruncate(self._fd, self._offset)
+            self._dirty = True
+            self.sync(force=True)
+        finally:
+            os.close(self._fd)
+
+
+class SpliceDataFileWriter:
+    """
+    splice 기반 데이터 파일 쓰기
+    소켓 → 파이프 → 파일로 커널 안에서만 데이터를 옮겨 사용자 공간 복사를 생략.
+    수신 단위 구분 개행 없이 받은 바이트 스트림을 그대로 저장 (Linux, Python 3.10+)
+    """
+
+    def __init__(self, data_file: Path):
+        """
+        데이터 파일과 전달용 파이프 열기
+
+        Args:
+            data_file: 데이터 파일 Path
+        """
+        # splice는 O_APPEND 파일을 거부하므로 끝으로 이동한 뒤 파일 위치를 사용
+        self._fd = os.open(data_file, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.lseek(self._fd, 0, os.SEEK_END)
+            self._pipe_r, self._pipe_w = os.pipe()
+        except Exception:
+            os.close(self._fd)
+            raise
+
+        if hasattr(fcntl, 'F_SETPIPE_SZ'):
+            try:
+                fcntl.fcntl(self._pipe_w, fcntl.F_SETPIPE_SZ, BUFFER_SIZE)
+            except OSError:
+                pass
+        self._dirty = False
+        self._fsync_future: Optional[Future] = None
+
+    def splice_from(self, sock_fd: int) -> int:
+        """
+        소켓에서 수신 가능한 데이터를 파일로 옮김
+
+        Args:
+            sock_fd: 논블로킹 클라이언트 소켓 디스크립터
+
+        Returns:
+            옮긴 바이트 수 (0이면 연결 종료)
+
+        Raises:
+            BlockingIOError: 수신 가능한 데이터가 없는 경우
+        """
+        n = os.splice(sock_fd, self._pipe_w, BUFFER_SIZE,
+                      flags=os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK)
+        remaining = n
+        while remaining:
+            remaining -= os.splice(self._pipe_r, self._fd, remaining, flags=os.SPLICE_F_MOVE)
+
+        if n:
+            self._dirty = True
+        return n
+
+    def seek_end(self) -> None:
+        """다른 writer가 기록을 마친 뒤 파일 끝으로 쓰기 위치 이동"""
+        os.lseek(self._fd, 0, os.SEEK_END)
+
+    def sync(self, force: bool = False) -> None:
+        """
+        fsync를 백그라운드 스레드에 예약
+        이전 fsync가 진행 중이면 다음 주기로 미룸
+
+        Args:
+            force: 이전 fsync와 관계없이 예약
+        """
+        if not self._dirty:
+            return
+
+        future = _schedule_fsync(self._fd, self._fsync_future, force)
+        if future is not None:
+            self._fsync_future = future
+            self._dirty = False
+
+    def close(self) -> None:
+        """파이프와 파일 닫기"""
+        try:
+            self.sync(force=True)
+        finally:
+            os.close(self._pipe_r)
+            os.close(self._pipe_w)
+            os.close(self._fd)
+
+
+class VectoredDataFileWriter:
+    """
+    writev 기반 데이터 파일 쓰기
+    모아 둔 여러 프레임을 한 번의 시스템 호출로 기록 (길이 프리픽스 프레임 모드)
+    """
+
+    def __init__(self, data_file: Path):
+        """
+        데이터 파일 열기
+
+        Args:
+            data_file: 데이터 파일 Path
+        """
+        self._fd = os.open(data_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._dirty = False
+        self._fsync_future: Optional[Future] = None
+
+    def write(self, data) -> None:
+        """
+        데이터 쓰기
+
+        Args:
+            data: bytes-like 객체
+        """
+        self.writev([data])
+
+    def writev(self, iovs: list) -> None:
+        """
+        여러 버퍼를 한 번에 쓰기
+
+        Args:
+            iovs: bytes-like 객체 리스트
+        """
+        total = sum(len(iov) for iov in iovs)
+        written = os.writev(self._fd, iovs)
+        if written < total:
+            # 드물게 일부만 기록되면 나머지를 이어서 기록
+            rest = memoryview(b''.join(iovs))[written:]
+            while rest:
+                rest = rest[os.write(self._fd, rest):]
+        self._dirty = True
+
+    def sync(self, force: bool = False) -> None:
+        """
+        fsync를 백그라운드 스레드에 예약
+        이전 fsync가 진행 중이면 다음 주기로 미룸
+
+        Args:
+            force: 이전 fsync와 관계없이 예약
+        """
+        if not self._dirty:
+            return
+
+        future = _schedule_fsync(self._fd, self._fsync_future, force)
+        if future is not None:
+            self._fsync_future = future
+            self._dirty = False
+
+    def close(self) -> None:
+        """파일 닫기"""
+        try:
+            self.sync(force=True)
+        finally:
+            os.close(self._fd)
+
+
+def open_data_writer(data_file: Path):
+    """
+    WRITE_MODE와 FRAMING에 맞는 데이터 파일 writer를 생성합니다.
+
+    Args:
+        data_file: 데이터 파일 Path
+
+    Returns:
+        DataFileWriter, MmapDataFileWriter, SpliceDataFileWriter
+        또는 VectoredDataFileWriter 객체
+    """
+    # 프레임 모드는 프레임 경계를 파싱해야 하므로 WRITE_MODE보다 우선
+    if FRAMING == 'length':
+        return VectoredDataFileWriter(data_file)
+    if WRITE_MODE == 'mmap':
+        return MmapDataFileWriter(data_file)
+    if WRITE_MODE == 'splice' and hasattr(os, 'splice'):
+        return SpliceDataFileWriter(data_file)
+    return DataFileWriter(data_file)
+
+
+class RecvBufferPool:
+    """
+    수신 버퍼 풀 (프레임 모드)
+    불완전한 프레임이 남아 있는 연결만 버퍼를 보유하고, 다 기록하면 반환해
+    유휴 연결은 수신 버퍼를 차지하지 않음
+    """
+
+    def __init__(self, count: int, size: int):
+        """
+        수신 버퍼 풀 초기화 (버퍼는 필요할 때 생성)
+
+        Args:
+            count: 최대 버퍼 개수
+            size: 버퍼 크기 (bytes)
+        """
+        self.count = count
+        self.size = size
+        self._free: List[memoryview] = []
+        self._allocated = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[memoryview]:
+        """
+        버퍼 하나를 빌림
+
+        Returns:
+            수신 버퍼 또는 None (풀이 모두 사용 중인 경우)
+        """
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            if self._allocated < self.count:
+                self._allocated += 1
+                return memoryview(bytearray(self.size))
+        return None
+
+    def release(self, buf: memoryview) -> None:
+        """
+        빌린 버퍼 반환
+
+        Args:
+            buf: acquire()로 받은 버퍼
+        """
+        with self._lock:
+            self._free.append(buf)
+
+
+_recv_buffer_pool = RecvBufferPool(RECV_BUF_POOL_SIZE, BUFFER_SIZE)
+
+
+class ClientConnection:
+    """
+    클라이언트 연결 상태
+    이벤트 루프에서 클라이언트 소켓과 데이터 파일을 함께 관리
+    """
+
+    def __init__(self, client_socket: socket.socket, client_addr: tuple, data_file: Path):
+        """
+        클라이언트 연결 초기화
+
+        Args:
+            client_socket: 클라이언트 소켓 객체
+            client_addr: 클라이언트 주소 튜플
+            data_file: 데이터 파일 Path
+        """
+        self.client_socket = client_socket
+        self.client_addr = client_addr
+        self.data_file = data_file
+        self._writer = open_data_writer(data_file)
+
+        try:
+            # 수신 경로에서 매번 조회하지 않도록 디스크립터와 메서드를 연결 시점에 고정
+            self.fd = client_socket.fileno()
+            self._recv_into = client_socket.recv_into
+        except Exception:
+            self._writer.close()
+            raise
+        # splice writer는 write()가 없음 (소켓에서 직접 옮김)
+        self._write = getattr(self._writer, 'write', None)
+        self._pool_warned = False
+
+        # 프레임 모드: 저장하지 않은 프레임이 남아 있는 동안에만 버퍼를 보유
+        self._framed = isinstance(self._writer, VectoredDataFileWriter)
+        self._frame_buffer: Optional[memoryview] = None
+        self._frame_pooled = False
+        self._filled = 0
+        self._parsed = 0
+        self._iovs: list = []
+
+        # 대용량 업로드(카메라 스트림 등)는 일정량 이후 splice로 전환
+        self._received = 0
+        self._splice_at = 0
+        if (LARGE_PAYLOAD_THRESHOLD > 0 and hasattr(os, 'splice')
+                and isinstance(self._writer, (DataFileWriter, MmapDataFileWriter))):
+            self._splice_at = LARGE_PAYLOAD_THRESHOLD
+
+    def _fallback_buffer(self) -> memoryview:
+        """
+        풀이 고갈되었을 때 사용할 연결 전용 버퍼
+        풀 버퍼와 마찬가지로 보류 중인 프레임이 없어지면 해제됨
+
+        Returns:
+            연결 전용 수신 버퍼
+        """
+        if not self._pool_warned:
+            self._pool_warned = True
+            logger.warning(f"수신 버퍼 풀 부족 ({RECV_BUF_POOL_SIZE}개), 연결 전용 버퍼 사용: {self.client_addr}")
+        return memoryview(bytearray(BUFFER_SIZE))
+
+    def receive(self, recv_view: memoryview) -> bool:
+        """
+        수신 가능한 데이터를 한 번 읽어 파일에 저장
+
+        Args:
+            recv_view: 이벤트 루프가 공유하는 수신 버퍼 (수신과 저장이 한 호출 안에서
+                끝나므로 워커당 하나로 충분)
+
+        Returns:
+            연결을 유지하면 True, 종료해야 하면 False
+        """
+        if isinstance(self._writer, SpliceDataFileWriter):
+            return self._receive_splice()
+        if self._framed:
+            return self._receive_frames()
+        return self._receive_into(recv_view)
+
+    def _receive_into(self, recv_view: memoryview) -> bool:
+        """
+        버퍼로 데이터를 받아 파일에 저장
+
+        Args:
+            recv_view: 수신 버퍼
+
+        Returns:
+            연결을 유지하면 True, 종료해야 하면 False
+        """
+        try:
+            n = self._recv_into(recv_view, BUFFER_SIZE)
+        except BlockingIOError:
+            return True
+        except socket.error as e:
+            logger.error(f"소켓 오류: {e}")
+            return False
+
+        if not n:
+            logger.info("클라이언트 연결 종료")
+            return False
+
+        try:
+            # 수신한 바이트를 디코딩 없이 그대로 저장
+            self._write(recv_view[:n])
+            self._write(b'\n')
+
+            # 디버그 로그가 꺼져 있으면 디코딩하지 않음
+            if logger.isEnabledFor(logging.DEBUG):
+                preview = bytes(recv_view[:min(50, n)]).decode('utf-8', errors='replace')
+                logger.debug(f"데이터 수신: {preview}...")
+
+            if self._splice_at:
+                self._received += n
+                if self._received > self._splice_at:
+                    self._switch_to_splice()
+        except Exception as e:
+            logger.error(f"데이터 처리 중 오류: {e}")
+            return False
+
+        return True
+
+    def _switch_to_splice(self) -> None:
+        """
+        현재 writer를 닫고 같은 파일 끝에 이어 쓰는 splice writer로 전환
+        이후 수신 데이터는 사용자 공간을 거치지 않으며 수신 단위 구분 개행도 붙지 않음
+        """
+        self._splice_at = 0
+        # 새 writer를 먼저 열어 실패해도 기존 writer가 그대로 남도록 함
+        splice_writer = SpliceDataFileWriter(self.data_file)
+        previous, self._writer = self._writer, splice_writer
+        self._write = None
+        try:
+            previous.close()
+        finally:
+            # 기존 writer가 버퍼를 비우고 미리 할당한 영역을 잘라낸 뒤의 끝에서 이어 씀
+            splice_writer.seek_end()
+        logger.info(f"대용량 수신, splice로 전환: {self.client_addr} ({self._received} bytes)")
+
+    def _receive_frames(self) -> bool:
+        """
+        길이 프리픽스 프레임을 받아 FRAME_BATCH개씩 writev로 저장
+
+        Returns:
+            연결을 유지하면 True, 종료해야 하면 False
+        """
+        if self._frame_buffer is None:
+            self._frame_buffer = _recv_buffer_pool.acquire()
+            self._frame_pooled = self._frame_buffer is not None
+            if not self._frame_pooled:
+                self._frame_buffer = self._fallback_buffer()
+
+        try:
+            n = self._recv_into(self._frame_buffer[self._filled:])
+        except BlockingIOError:
+            return True
+        except socket.error as e:
+            logger.error(f"소켓 오류: {e}")
+            return False
+
+        if not n:
+            logger.info("클라이언트 연결 종료")
+            return False
+
+        self._filled += n
+
+        try:
+            self._parse_frames()
+            # 배치가 찼거나 버퍼에 남은 공간이 없으면 기록.
+            # 주기 저장이 꺼져 있으면 불완전한 프레임이 없을 때 바로 기록해 버퍼를 반환
+            if (len(self._iovs) >= FRAME_BATCH * 2 or self._filled == len(self._frame_buffer)
+                    or (FSYNC_INTERVAL <= 0 and self._parsed == self._filled)):
+                self._flush_frames()
+        except Exception as e:
+            logger.error(f"데이터 처리 중 오류: {e}")
+            return False
+
+        return True
+
+    def _parse_frames(self) -> None:
+        """버퍼에서 완성된 프레임을 찾아 기록 대기 목록에 추가 (복사 없이 슬라이스 사용)"""
+        buf = self._frame_buffer
+        header_size = FRAME_HEADER.size
+        while self._filled - self._parsed >= header_size:
+            (length,) = FRAME_HEADER.unpack_from(buf, self._parsed)
+            if length > len(buf) - header_size:
+                raise ValueError(f"프레임이 수신 버퍼보다 큼: {length} bytes")
+
+            end = self._parsed + header_size + length
+            if end > self._filled:
+                break
+
+            self._iovs.append(buf[self._parsed + header_size:end])
+            self._iovs.append(b'\n')
+            self._parsed = end
+
+    def _flush_frames(self) -> None:
+        """대기 중인 프레임을 writev로 기록하고 남은 불완전 프레임을 버퍼 앞으로 이동"""
+        if self._iovs:
+            self._writer.writev(self._iovs)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"프레임 저장: {len(self._iovs) // 2}개")
+            self._iovs.clear()
+
+        remaining = self._filled - self._parsed
+        if remaining and self._parsed:
+            self._frame_buffer[:remaining] = bytes(self._frame_buffer[self._parsed:self._filled])
+        elif not remaining:
+            # 보류 중인 데이터가 없으면 버퍼를 풀에 반환
+            self._release_frame_buffer()
+        self._filled = remaining
+        self._parsed = 0
+
+    def _release_frame_buffer(self) -> None:
+        """프레임 버퍼를 풀에 반환 (풀에서 빌린 경우)"""
+        if self._frame_buffer is not None and self._frame_pooled:
+            _recv_buffer_pool.release(self._frame_buffer)
+        self._frame_buffer = None
+
+    def _receive_splice(self) -> bool:
+        """
+        splice로 소켓 데이터를 파일에 직접 저장
+
+        Returns:
+            연결을 유지하면 True, 종료해야 하면 False
+        """
+        try:
+            n = self._writer.splice_from(self.fd)
+        except BlockingIOError:
+            return True
+        except OSError as e:
+            logger.error(f"splice 오류: {e}")
+            return False
+
+        if not n:
+            logger.info("클라이언트 연결 종료")
+            return False
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"데이터 수신: {n} bytes")
+        return True
+
+    def sync(self) -> None:
+        """대기 중인 프레임을 기록하고 데이터 파일을 디스크에 저장"""
+        if self._framed:
+            try:
+                self._flush_frames()
+            except Exception as e:
+                logger.error(f"프레임 저장 실패: {e}")
+        self._writer.sync()
+
+    def close(self) -> None:
+        """파일과 소켓 정리"""
+        try:
+            try:
+                if self._framed:
+                    self._flush_frames()
+                    if self._filled:
+                        logger.warning(f"불완전한 프레임 폐기: {self._filled} bytes")
+                        self._filled = 0
+                        self._flush_frames()
+            finally:
+                self._writer.close()
+            logger.info(f"데이터 파일 저장 완료: {self.data_file}")
+        except Exception as e:
+            logger.error(f"데이터 파일 닫기 실패: {e}")
+        finally:
+            # 기록에 실패해도 빌린 버퍼는 반드시 반환
+            self._release_frame_buffer()
+            self.client_socket.close()
+            logger.info(f"클라이언트 연결 종료: {self.client_addr}")
+
+
+def accept_client(server_socket: socket.socket, data_dir: Path) -> Optional[ClientConnection]:
+    """
+    대기 중인 클라이언트 연결을 수락합니다.
+
+    Args:
+        server_socket: 논블로킹 서버 소켓
+        data_dir: resolve()된 데이터 디렉토리 Path
+
+    Returns:
+        ClientConnection 객체 또는 None (대기 중인 연결이 없거나 실패 시)
+
+    Raises:
+        OSError: 파일 디스크립터 부족(EMFILE/ENFILE)으로 연결을 받을 수 없는 경우
     """
+    try:
+        client_socket, client_addr = server_socket.accept()
+    except BlockingIOError:
+        return None
+
     logger.info(f"클라이언트 연결: {client_addr}")
-    
+
     try:
+        configure_client_socket(client_socket)
+
         # 환영 메시지 전송
+        client_socket.setblocking(True)
         client_socket.sendall(WELCOME_MESSAGE.encode('utf-8'))
-        
+
         # 데이터 파일 생성
         data_file = create_data_file(data_dir)
         logger.info(f"데이터 파일 생성: {data_file}")
+
+        conn = ClientConnection(client_socket, client_addr, data_file)
+    except Exception as e:
+        logger.error(f"클라이언트 처리 중 오류: {e}")
+        client_socket.close()
+        if isinstance(e, OSError) and e.errno in (errno.EMFILE, errno.ENFILE):
+            # 데이터 파일을 열 디스크립터가 없으면 이벤트 루프가 accept를 멈추도록 전달
+            raise
+        return None
+
+    client_socket.setblocking(False)
+    return conn
+
+
+def serve_forever(server_socket: socket.socket, data_dir: Path,
+                  stop_event: Optional[threading.Event] = None) -> None:
+    """
+    이벤트 루프에서 연결 수락과 데이터 수신을 처리합니다.
+
+    epoll 등 OS의 준비 상태 통지를 사용하므로 응답이 없는 ESP32가
+    다른 기기의 처리를 막지 않습니다. 동시 연결이 MAX_CONNS에 도달하면
+    연결이 끝날 때까지 accept를 멈추고 커널 backlog에 대기시킵니다.
+
+    Args:
+        server_socket: 바인딩된 서버 소켓
+        data_dir: resolve()된 데이터 디렉토리 Path
+        stop_event: 설정되면 루프를 종료하는 이벤트 (워커 스레드용)
+    """
+    server_socket.setblocking(False)
+
+    # 연결마다 버퍼를 만들지 않고 루프 전체에서 하나를 재사용
+    recv_view = memoryview(bytearray(BUFFER_SIZE))
+
+    # 주기적으로 데이터 파일을 디스크에 저장 (패킷마다 flush하지 않음)
+    sync_timeout = FSYNC_INTERVAL if FSYNC_INTERVAL > 0 else None
+    next_sync = time.monotonic() + FSYNC_INTERVAL
+
+    # 워커 스레드는 종료 요청을 확인할 수 있도록 주기적으로 깨어남
+    select_timeout = sync_timeout
+    if stop_event is not None:
+        select_timeout = min(sync_timeout or STOP_POLL_INTERVAL, STOP_POLL_INTERVAL)
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(server_socket, selectors.EVENT_READ, None)
+        accepting = True
+        active = 0
+        # 디스크립터 부족으로 accept를 멈췄을 때 다시 시도할 시각
+        accept_retry_at: Optional[float] = None
+
+        try:
+            while stop_event is None or not stop_event.is_set():
+                timeout = select_timeout
+                if accept_retry_at is not None:
+                    timeout = min(timeout or ACCEPT_RETRY_DELAY, ACCEPT_RETRY_DELAY)
+
+                for key, _ in selector.select(timeout):
+                    try:
+                        if key.data is None:
+                            try:
+                                conn = accept_client(server_socket, data_dir)
+                            except OSError as e:
+                                if e.errno not in (errno.EMFILE, errno.ENFILE):
+                                    raise
+                                # 리스너가 계속 읽기 가능 상태로 남아 루프가 헛돌지 않도록 잠시 제외
+                                logger.warning(f"파일 디스크립터 부족, 연결 수락 일시 중지: {e}")
+                                selector.unregister(server_socket)
+                                accepting = False
+                                accept_retry_at = time.monotonic() + ACCEPT_RETRY_DELAY
+                                continue
+                            if conn:
+                                selector.register(conn.fd, selectors.EVENT_READ, conn)
+                                active += 1
+                                if active >= MAX_CONNS:
+                                    logger.warning(f"최대 연결 수 도달 ({MAX_CONNS}), 연결 수락 일시 중지")
+                                    selector.unregister(server_socket)
+                                    accepting = False
+                            continue
+
+                        conn = key.data
+                        if not conn.receive(recv_view):
+                            selector.unregister(conn.fd)
+                            conn.close()
+                            active -= 1
+                            if not accepting:
+                                selector.register(server_socket, selectors.EVENT_READ, None)
+                                accepting = True
+                    except Exception as e:
+                        logger.error(f"서버 오류: {e}")
+
+                now = time.monotonic()
+                if accept_retry_at is not None and now >= accept_retry_at:
+                    accept_retry_at = None
+                    if not accepting and active < MAX_CONNS:
+                        selector.register(server_socket, selectors.EVENT_READ, None)
+                        accepting = True
+
+                if sync_timeout and now >= next_sync:
+                    for key in list(selector.get_map().values()):
+                        if key.data is None:
+                            continue
+                        conn = key.data
+                        try:
+                            conn.sync()
+                        except Exception as e:
+                            # 저장에 실패한 연결만 정리하고 다른 연결은 계속 처리
+                            logger.error(f"데이터 파일 저장 실패: {conn.client_addr}: {e}")
+                            selector.unregister(conn.fd)
+                            conn.close()
+                            active -= 1
+                            if not accepting:
+                                selector.register(server_socket, selectors.EVENT_READ, None)
+                                accepting = True
+                    next_sync = now + FSYNC_INTERVAL
+        finally:
+            for key in list(selector.get_map().values()):
+                if key.data is not None:
+                    selector.unregister(key.fileobj)
+                    key.data.close()
+
+
+def create_server_socket(host: str, port: int, reuse_port: bool = False) -> socket.socket:
+    """
+    서버 소켓을 생성하고 바인딩합니다.
+
+    Args:
+        host: 바인딩할 주소
+        port: 바인딩할 포트
+        reuse_port: SO_REUSEPORT 사용 여부 (커널이 여러 소켓에 연결을 분산)
+
+    Returns:
+        listen 상태의 서버 소켓
+    """
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        server_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # listen 전에 설정해야 TCP 윈도우 스케일링에 반영됨
+        set_receive_buffer(server_socket, SOCKET_RCVBUF_SIZE)
+        if DEFER_ACCEPT_SECS > 0 and hasattr(socket, 'TCP_DEFER_ACCEPT'):
+            server_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_DEFER_ACCEPT, DEFER_ACCEPT_SECS)
+
+        server_socket.bind((host, port))
+        # 재접속이 몰려도 SYN/accept 큐가 넘치지 않도록 큰 backlog 사용
+        server_socket.listen(LISTEN_BACKLOG)
+    except Exception:
+        server_socket.close()
+        raise
+
+    return server_socket
+
+
+def start_log_listener() -> logging.handlers.QueueListener:
+    """
+    루트 로거의 핸들러를 큐 핸들러로 바꾸고 백그라운드 스레드에서 출력합니다.
+
+    이벤트 루프는 레코드를 큐에 넣기만 하고 포맷팅과 출력은 리스너 스레드가
+    처리합니다. 스레드는 fork 후 복제되지 않으므로 프로세스마다 호출합니다.
+
+    Returns:
+        시작된 QueueListener (종료 시 stop_log_listener에 전달)
+    """
+    root = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+    return listener
+
+
+def stop_log_listener(listener: logging.handlers.QueueListener) -> None:
+    """
+    남은 로그를 모두 출력하고 루트 로거의 원래 핸들러를 복원합니다.
+
+    Args:
+        listener: start_log_listener가 반환한 QueueListener
+    """
+    listener.stop()
+    logging.getLogger().handlers = list(listener.handlers)
+
+
+def _serve_worker(server_socket: socket.socket, data_dir: Path,
+                  stop_event: threading.Event, own_socket: bool) -> None:
+    """
+    워커 스레드에서 serve_forever를 실행합니다.
+
+    워커가 예기치 않게 종료되면 오류를 기록하고, 전용 SO_REUSEPORT 소켓이면
+    닫아서 커널이 더 이상 이 워커로 연결을 보내지 않도록 합니다.
+
+    Args:
+        server_socket: 바인딩된 서버 소켓
+        data_dir: resolve()된 데이터 디렉토리 Path
+        stop_event: 설정되면 루프를 종료하는 이벤트
+        own_socket: 이 워커 전용 소켓 여부
+    """
+    try:
+        serve_forever(server_socket, data_dir, stop_event)
+    except Exception as e:
+        logger.error(f"워커 오류로 종료: {threading.current_thread().name}: {e}")
+        if own_socket:
+            server_socket.close()
+
+
+def run_server(host: str, port: int, data_dir: Path, workers: int, reuse_port: bool) -> None:
+    """
+    서버 소켓을 열고 워커 스레드와 이벤트 루프를 실행합니다.
+
+    Args:
+        host: 바인딩할 주소
+        port: 바인딩할 포트
+        data_dir: resolve()된 데이터 디렉토리 Path
+        workers: 이벤트 루프 스레드 수
+        reuse_port: SO_REUSEPORT 사용 여부 (워커/프로세스마다 소켓 생성)
+    """
+    server_sockets = []
+    stop_event = threading.Event()
+    threads = []
+    log_listener = start_log_listener()
+    
+    try:
+        try:
+            for _ in range(workers if reuse_port else 1):
+                server_sockets.append(create_server_socket(host, port, reuse_port))
+        except OSError as e:
+            logger.error(f"소켓 바인딩 실패: {e}")
+            sys.exit(1)
+        logger.info(f"서버 시작: {host}:{port} (워커 {workers}개)")
+        logger.info(f"데이터 디렉토리: {data_dir}")
         
-        # 파일 쓰기 (with 문으로 자동 닫기)
-        with open(data_file, 'a', encoding='utf-8') as f:
-            while True:
-                try:
-                    msg = client_socket.recv(BUFFER_SIZE)
-                    if not msg:
-                        logger.info("클라이언트 연결 종료")
-                        break
-                    
-                    # 데이터 디코딩 및 저장
-                    decoded_msg = msg.decode('utf-8', errors='replace')
-                    f.write(f"{decoded_msg}\n")
-                    f.flush()  # 즉시 디스크에 쓰기
-                    
-                    logger.debug(f"데이터 수신: {decoded_msg[:50]}...")
-                    
-                except socket.error as e:
-                    logger.error(f"소켓 오류: {e}")
-                    break
-                except Exception as e:
-                    logger.error(f"데이터 처리 중 오류: {e}")
-                    break
-        
-        logger.info(f"데이터 파일 저장 완료: {data_file}")
+        for i in range(1, workers):
+            thread = threading.Thread(
+                target=_serve_worker,
+                args=(server_sockets[i % len(server_sockets)], data_dir, stop_event, reuse_port),
+                name=f'worker-{i}',
+                daemon=True
+            )
+            thread.start()
+            threads.append(thread)
         
+        try:
+            serve_forever(server_sockets[0], data_dir)
+        except KeyboardInterrupt:
+            logger.info("서버 종료 요청")
+                
     except Exception as e:
-        logger.error(f"클라이언트 처리 중 오류: {e}")
+        logger.error(f"서버 오류로 종료: {e}")
+        sys.exit(1)
     finally:
-        client_socket.close()
-        logger.info(f"클라이언트 연결 종료: {client_addr}")
+        # 워커 스레드가 열린 파일을 정리할 때까지 대기
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+        for server_socket in server_sockets:
+            server_socket.close()
+        logger.info("서버 종료")
+        stop_log_listener(log_listener)
+
+
+def _raise_keyboard_interrupt(signum, frame) -> None:
+    """SIGTERM을 KeyboardInterrupt로 바꿔 열린 데이터 파일을 정리한 뒤 종료"""
+    raise KeyboardInterrupt
+
+
+def run_processes(count: int, host: str, port: int, data_dir: Path, workers: int) -> None:
+    """
+    SO_REUSEPORT로 같은 포트를 공유하는 서버 프로세스를 여러 개 실행합니다.
+
+    커널이 프로세스별 accept 큐에 연결을 분산하고, 각 프로세스는
+    CPU 하나에 고정되어 캐시와 NIC 큐 지역성을 유지합니다.
+
+    Args:
+        count: 프로세스 수
+        host: 바인딩할 주소
+        port: 바인딩할 포트
+        data_dir: resolve()된 데이터 디렉토리 Path
+        workers: 프로세스당 이벤트 루프 스레드 수
+    """
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else []
+    children = []
+    
+    for i in range(count):
+        pid = os.fork()
+        if pid == 0:
+            # 자식 프로세스: 터미널 SIGINT는 무시하고 부모가 보내는 SIGTERM으로만 종료
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            exit_code = 0
+            try:
+                if cpus:
+                    os.sched_setaffinity(0, {cpus[i % len(cpus)]})
+                run_server(host, port, data_dir, workers, reuse_port=True)
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else 1
+            except BaseException as e:
+                logger.error(f"서버 프로세스 오류: {e}")
+                exit_code = 1
+            finally:
+                # os._exit는 종료 처리를 건너뛰므로 예약된 fsync와 로그를 먼저 마무리
+                _fsync_executor.shutdown(wait=True)
+                logging.shutdown()
+                os._exit(exit_code)
+        children.append(pid)
+    
+    logger.info(f"서버 프로세스 {count}개 시작: {children}")
+    
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        logger.info("서버 종료 요청")
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
 
 
 def main() -> None:
     """메인 서버 함수"""
     # 데이터 디렉토리 확인
-    data_dir = ensure_data_directory()
+    # 연결마다 경로를 다시 해석하지 않도록 한 번만 resolve
+    data_dir = ensure_data_directory().resolve(strict=True)
     
     # 환경 변수에서 설정 읽기 (보안: 하드코딩 방지)
     host = os.getenv('SOCKET_SERVER_HOST', DEFAULT_HOST)
     port = int(os.getenv('SOCKET_SERVER_PORT', DEFAULT_PORT))
+    workers = max(1, int(os.getenv('SOCKET_SERVER_WORKERS', DEFAULT_WORKERS)))
+    processes = int(os.getenv('SOCKET_SERVER_PROCESSES', DEFAULT_PROCESSES))
+    if processes <= 0:
+        processes = os.cpu_count() or 1
     
-    # 서버 소켓 생성
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    # procd 등이 보내는 SIGTERM에서도 버퍼링된 데이터를 저장하고 종료
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
     
-    try:
-        server_socket.bind((host, port))
-        server_socket.listen(5)
-        logger.info(f"서버 시작: {host}:{port}")
-        logger.info(f"데이터 디렉토리: {data_dir.absolute()}")
-        
-        while True:
-            try:
-                client_socket, client_addr = server_socket.accept()
-                handle_client(client_socket, client_addr, data_dir)
-            except KeyboardInterrupt:
-                logger.info("서버 종료 요청")
-                break
-            except Exception as e:
-                logger.error(f"서버 오류: {e}")
-                continue
-                
-    except OSError as e:
-        logger.error(f"소켓 바인딩 실패: {e}")
-        sys.exit(1)
-    except Exception as e:
-        logger.error(f"서버 시작 실패: {e}")
-        sys.exit(1)
-    finally:
-        server_socket.close()
-        logger.info("서버 종료")
+    if processes > 1 and hasattr(os, 'fork') and hasattr(socket, 'SO_REUSEPORT'):
+        run_processes(processes, host, port, data_dir, workers)
+        return
+    
+    # 워커마다 SO_REUSEPORT 소켓을 두어 커널이 accept를 분산 (미지원 시 소켓 공유)
+    reuse_port = workers > 1 and hasattr(socket, 'SO_REUSEPORT')
+    run_server(host, port, data_dir, workers, reuse_port)
 
 
 if __name__ == "__main__":